@@ -14,18 +14,18 @@ from enum import Enum, IntEnum, auto
 from typing import Dict, Optional, Any
 
 # Rendering
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 from io import BytesIO
-import math
+from collections import OrderedDict
 
 # Sessions and Threads
 import asyncio
-import aiohttp
+from concurrent.futures import ProcessPoolExecutor
 
 @dataclass
 class Member:
     name: str
-    avatar_url: str
+    avatar: discord.Asset
 
 class Tier(Enum):
     S = 0
@@ -38,26 +38,23 @@ class Tier(Enum):
 class Tierlist:
     def __init__(self):
         self.tiers: Dict[Tier, Dict[int, Member]] = {tier: {} for tier in Tier}
+        self._by_id: Dict[int, Tier] = {}
 
-    def add_member(self, _id: int, _data: Member, target_tier: Tier) -> bool:
-        if target_tier not in Tier:
-            return False
-    
-        for tier in self.tiers:
-            if _id in self.tiers[tier]:
-                del self.tiers[tier][_id]
-                break
+    def add_member(self, _id: int, _data: Member, target_tier: Tier) -> None:
+        old = self._by_id.get(_id)
+        if old is not None:
+            del self.tiers[old][_id]
 
         self.tiers[target_tier][_id] = _data
-        return True
+        self._by_id[_id] = target_tier
 
     def remove_member(self, _id: int) -> bool:
-        for tier in self.tiers:
-            if _id in self.tiers[tier]:
-                del self.tiers[tier][_id]
-                return True
+        old = self._by_id.pop(_id, None)
+        if old is None:
+            return False
 
-        return False
+        del self.tiers[old][_id]
+        return True
 
 class TierlistError(IntEnum):
     SUCCESS = auto()
@@ -93,9 +90,7 @@ class TierlistManager:
         if self.currently_active is None:
             return TierlistError.TIERLIST_NOT_ACTIVE
 
-        if not self.tierlists[self.currently_active].add_member(_id, _data, target_tier):
-            return TierlistError.INVALID_TIER
-            
+        self.tierlists[self.currently_active].add_member(_id, _data, target_tier)
         return TierlistError.SUCCESS
 
     def remove_from_tierlist(self, _id: int) -> TierlistError:
@@ -117,8 +112,37 @@ class TierlistRenderer:
         self.padding = 10
         self.text_height = 20
         self.min_tier_height = 100
+        self.background = (30, 30, 30)
         self.label_width = int(self.total_width * 0.15)
         self.content_width = self.total_width - self.label_width
+
+        # layout constants used by every height/position calculation
+        self._unit_width = self.avatar_size + self.padding
+        self._unit_height = self.avatar_size + self.text_height + self.padding
+        self._avatars_per_row = max(1, self.content_width // self._unit_width)
+
+        self._circle_mask = Image.new("L", (self.avatar_size, self.avatar_size), 0)
+        ImageDraw.Draw(self._circle_mask).ellipse((0, 0, self.avatar_size - 1, self.avatar_size - 1), fill=255)
+
+        # avatar urls are stable per (user, avatar hash), so keep raw bytes around
+        self._avatar_cache: OrderedDict[str, bytes] = OrderedDict()
+        self._cache_cap = 512
+
+        # decoded + resized avatars, so warm renders skip the PNG decode and resample
+        self._thumb_cache: OrderedDict[tuple[str, int], Image.Image] = OrderedDict()
+
+        # pre-drawn backgrounds (label column, colors, separators) keyed by tier heights
+        self._skeleton_cache: OrderedDict[tuple[int, ...], Image.Image] = OrderedDict()
+        self._skeleton_cap = 32
+
+        # rasterized name labels, so recurring names skip FreeType on every render
+        self._name_cache: OrderedDict[str, tuple[Image.Image, tuple[int, int]]] = OrderedDict()
+        self._name_cap = 1024
+
+        # caps in-flight avatar reads; created lazily inside the running loop
+        self._fetch_sem: Optional[asyncio.Semaphore] = None
+        self._fetch_limit = 16
+        self._fetch_timeout = 5.0
         
         self.tier_colors = {
             'S': (255, 127, 127),
@@ -134,64 +158,117 @@ class TierlistRenderer:
             self.font_names = ImageFont.truetype("arial.ttf", 15)
         except IOError:
             self.font_label = ImageFont.load_default()
-            self.font_name = ImageFont.load_default()
+            self.font_names = ImageFont.load_default()
         
     def _calc_tier_height(self, num_members: int) -> int:
         if num_members == 0:
             return self.min_tier_height + (self.padding * 2)
             
-        unit_width = self.avatar_size + self.padding
-        avatars_per_row = self.content_width // unit_width
-        if avatars_per_row < 1:
-            avatars_per_row = 1
-            
-        unit_height = self.avatar_size + self.text_height + self.padding
-        required_rows = math.ceil(num_members / avatars_per_row)
-        total_height = (required_rows * unit_height) + self.padding
+        required_rows = (num_members + self._avatars_per_row - 1) // self._avatars_per_row
+        total_height = (required_rows * self._unit_height) + self.padding
         
         return total_height
         
-    async def render(self, tierlist: Tierlist) -> BytesIO:
-        avatar_images = {}
-        async with aiohttp.ClientSession() as session:
-            tasks = []
-            for tier_data in tierlist.tiers.values():
-                for uid, member in tier_data.items():
-                    tasks.append(self._download(session, uid, member.avatar_url))
-            
-            results = await asyncio.gather(*tasks)
-            for uid, data in results:
-                if data: avatar_images[uid] = data
-
-        return await asyncio.to_thread(self._draw, tierlist, avatar_images)
+    async def render(self, tierlist: Tierlist, pool: ProcessPoolExecutor) -> bytes:
+        # copy taken before any await, so /add or /remove running during the
+        # downloads can't change what gets drawn
+        members_by_tier = {tier: list(members.items()) for tier, members in tierlist.tiers.items()}
+        # the worker only needs names; Assets carry client state and don't pickle
+        snapshot = {tier: [(uid, member.name) for uid, member in members] for tier, members in members_by_tier.items()}
+
+        avatar_images: Dict[int, Image.Image] = {}
+        urls: Dict[int, str] = {}
+        cached = []
+        missing = []
+        for members in members_by_tier.values():
+            for uid, member in members:
+                url = member.avatar.url
+                urls[uid] = url
+                thumb = self._thumb_cache.get((url, self.avatar_size))
+                if thumb is not None:
+                    self._thumb_cache.move_to_end((url, self.avatar_size))
+                    avatar_images[uid] = thumb
+                    continue
+
+                data = self._avatar_cache.get(url)
+                if data is not None:
+                    self._avatar_cache.move_to_end(url)
+                    cached.append((uid, data))
+                else:
+                    missing.append((uid, member.avatar))
+
+        loop = asyncio.get_running_loop()
+
+        # fully warm: every thumbnail is cached, go straight to drawing
+        if not missing and not cached:
+            return await loop.run_in_executor(pool, _draw_standalone, snapshot, avatar_images)
+
+        # start the downloads first so the cached decodes overlap with network time
+        tasks = [asyncio.create_task(self._download(uid, asset)) for uid, asset in missing]
+
+        if cached:
+            # one thread hop for all cached bytes rather than one per avatar
+            images = await asyncio.to_thread(lambda: [self._decode(data) for _, data in cached])
+            for (uid, _), img in zip(cached, images):
+                if img: avatar_images[uid] = self._store_thumb(urls[uid], img)
+
+        # decode each avatar as soon as its bytes arrive instead of waiting on all of them
+        for coro in asyncio.as_completed(tasks):
+            uid, data = await coro
+            if data:
+                img = await asyncio.to_thread(self._decode, data)
+                if img: avatar_images[uid] = self._store_thumb(urls[uid], img)
+
+        return await loop.run_in_executor(pool, _draw_standalone, snapshot, avatar_images)
         
-    async def _download(self, session, user_id: int, url):
+    async def _download(self, user_id: int, asset: discord.Asset):
+        if self._fetch_sem is None:
+            self._fetch_sem = asyncio.Semaphore(self._fetch_limit)
+
         try:
-            async with session.get(url) as resp:
-                if resp.status == 200:
-                    data = await resp.read()
-                    return user_id, BytesIO(data)
-        except:
-            pass
-            
-        return user_id, None
-        
-    def _draw(self, tierlist: Tierlist, avatar_images: Dict[int, BytesIO]) -> BytesIO:
-        tier_heights = {}
-        total_canvas_height = 0
+            async with self._fetch_sem:
+                data = await asyncio.wait_for(asset.read(), timeout=self._fetch_timeout)
+        except Exception:
+            return user_id, None
+
+        self._avatar_cache[asset.url] = data
+        self._avatar_cache.move_to_end(asset.url)
+        while len(self._avatar_cache) > self._cache_cap:
+            self._avatar_cache.popitem(last=False)
+        return user_id, data
+
+    def _store_thumb(self, url: str, img: Image.Image) -> Image.Image:
+        key = (url, self.avatar_size)
+        self._thumb_cache[key] = img
+        self._thumb_cache.move_to_end(key)
+        while len(self._thumb_cache) > self._cache_cap:
+            self._thumb_cache.popitem(last=False)
+        return img
+
+    def _decode(self, data: bytes) -> Optional[Image.Image]:
+        try:
+            img = Image.open(BytesIO(data))
+            if img.mode != "RGBA":
+                img = img.convert("RGBA")
+            # bilinear is the resampler Pillow-SIMD vectorizes best
+            img = img.resize((self.avatar_size, self.avatar_size), Image.Resampling.BILINEAR)
+            # bake the round crop into the alpha once, so drawing stays a single paste
+            img.putalpha(ImageChops.multiply(img.getchannel("A"), self._circle_mask))
+            # the content area is a flat color, so blend against it once here and the
+            # draw loop can blit opaque RGB without a per-paste alpha composite
+            flat = Image.new("RGB", img.size, self.background)
+            flat.paste(img, (0, 0), img)
+            return flat
+        except Exception as e:
+            print(f"Error decoding avatar: {e}")
+            return None
         
-        for tier, members in tierlist.tiers.items():
-            h = self._calc_tier_height(len(members))
-            tier_heights[tier] = h
-            total_canvas_height += h
-            
-        canvas = Image.new("RGB", (self.total_width, total_canvas_height), (30, 30, 30))
+    def _draw_skeleton(self, heights: tuple[int, ...]) -> Image.Image:
+        canvas = Image.new("RGB", (self.total_width, sum(heights)), self.background)
         draw = ImageDraw.Draw(canvas)
-        
+
         current_y = 0
-        for tier, members in tierlist.tiers.items():
-            row_h = tier_heights[tier]
-            
+        for tier, row_h in zip(Tier, heights):
             # left label box
             draw.rectangle(
                 [(0, current_y), (self.label_width, current_y + row_h)],
@@ -207,56 +284,95 @@ class TierlistRenderer:
                 font=self.font_label,
                 anchor="mm"
             )
+
+            # separator
+            draw.line(
+                [(0, current_y + row_h), (self.total_width, current_y + row_h)], 
+                fill=(0,0,0), 
+                width=2
+            )
+            current_y += row_h
+
+        return canvas
+
+    def _render_name(self, text: str) -> tuple[Image.Image, tuple[int, int]]:
+        cached = self._name_cache.get(text)
+        if cached is not None:
+            self._name_cache.move_to_end(text)
+            return cached
+
+        # bbox is relative to the "mt" anchor, so (left, top) is the paste offset from it
+        left, top, right, bottom = self.font_names.getbbox(text, anchor="mt")
+        stamp = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+        ImageDraw.Draw(stamp).text(
+            (-left, -top),
+            text,
+            fill=(200, 200, 200),
+            font=self.font_names,
+            anchor="mt"
+        )
+
+        self._name_cache[text] = (stamp, (left, top))
+        while len(self._name_cache) > self._name_cap:
+            self._name_cache.popitem(last=False)
+        return stamp, (left, top)
+
+    def _compute_positions(self, n: int, start_x: int, start_y: int) -> list[tuple[int, int]]:
+        xs = [start_x + col * self._unit_width for col in range(self._avatars_per_row)]
+        return [
+            (xs[col], start_y + row * self._unit_height)
+            for row, col in (divmod(index, self._avatars_per_row) for index in range(n))
+        ]
+
+    def _draw(self, snapshot: Dict[Tier, list[tuple[int, str]]], avatar_images: Dict[int, Image.Image]) -> bytes:
+        # labels, colors and separators only depend on the tier heights
+        heights = tuple(self._calc_tier_height(len(snapshot[tier])) for tier in Tier)
+        skeleton = self._skeleton_cache.get(heights)
+        if skeleton is None:
+            skeleton = self._draw_skeleton(heights)
+            self._skeleton_cache[heights] = skeleton
+            while len(self._skeleton_cache) > self._skeleton_cap:
+                self._skeleton_cache.popitem(last=False)
+        else:
+            self._skeleton_cache.move_to_end(heights)
+
+        canvas = skeleton.copy()
+        
+        current_y = 0
+        for tier, row_h in zip(Tier, heights):
+            members = snapshot[tier]
             
             # right side
-            unit_width = self.avatar_size + self.padding
-            unit_height = self.avatar_size + self.text_height + self.padding
-            avatars_per_row = self.content_width // unit_width
-            if avatars_per_row < 1: 
-                avatars_per_row = 1
-                
             start_x = self.label_width + self.padding
             start_y = current_y + self.padding
+            positions = self._compute_positions(len(members), start_x, start_y)
             
-            for index, (user_id, member) in enumerate(members.items()):
+            for (user_id, name), (x_pos, y_pos) in zip(members, positions):
                 if user_id in avatar_images:
-                    col = index % avatars_per_row
-                    row = index // avatars_per_row
-                    
-                    x_pos = start_x + (col * unit_width)
-                    y_pos = start_y + (row * unit_height)
-                    
-                    try:
-                        img = Image.open(avatar_images[user_id]).convert("RGBA")
-                        img = img.resize((self.avatar_size, self.avatar_size))
-                        canvas.paste(img, (x_pos, y_pos), img)
-                    except Exception as e:
-                        print(f"Error pasting avatar: {e}")
+                    img = avatar_images[user_id]
+                    canvas.paste(img, (x_pos, y_pos))
                         
-                    display_name = member.name
+                    display_name = name
                     if len(display_name) > 10:
                         display_name = display_name[:9] + ".."
                         
-                    draw.text(
-                        (x_pos + (self.avatar_size / 2), y_pos + self.avatar_size + 2),
-                        display_name,
-                        fill=(200, 200, 200),
-                        font=self.font_name,
-                        anchor="mt"
+                    stamp, (dx, dy) = self._render_name(display_name)
+                    canvas.paste(
+                        stamp,
+                        (x_pos + self.avatar_size // 2 + dx, y_pos + self.avatar_size + 2 + dy),
+                        stamp
                     )
                  
-            # separator
-            draw.line(
-                [(0, current_y + row_h), (self.total_width, current_y + row_h)], 
-                fill=(0,0,0), 
-                width=2
-            )
             current_y += row_h
             
         output = BytesIO()
-        canvas.save(output, format='PNG')
-        output.seek(0)
-        return output
+        # avatars are photographic so a palette won't fit; trade a little size for a much faster encode
+        canvas.save(output, format='PNG', compress_level=1, optimize=False)
+        return output.getvalue()
+
+def _draw_standalone(snapshot: Dict[Tier, list[tuple[int, str]]], avatar_images: Dict[int, Image.Image]) -> bytes:
+    # runs in a pool worker, which has its own module-level renderer (and caches)
+    return renderer._draw(snapshot, avatar_images)
 
 # Configuring bot connection
 
@@ -270,9 +386,17 @@ intents.message_content = True
 class Bot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix="$", intents=intents)
+        self.pool: Optional[ProcessPoolExecutor] = None
         
     async def setup_hook(self):    
+        # drawing + PNG encode is CPU bound, keep it off the bot process
+        self.pool = ProcessPoolExecutor(max_workers=2)
         await self.tree.sync()
+
+    async def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+        await super().close()
     
 bot = Bot()
 manager = TierlistManager()
@@ -312,7 +436,8 @@ async def add(interaction: discord.Interaction, member: discord.Member, tier: ap
         await interaction.response.send_message("Invalid Tier.", ephemeral=True)
         return
 
-    user_data = Member(name=member.display_name, avatar_url=member.display_avatar.url)
+    # let the CDN downscale; we only ever draw avatars at 100px
+    user_data = Member(name=member.display_name, avatar=member.display_avatar.replace(size=128))
     result = manager.add_to_tierlist(member.id, user_data, target_tier)
     
     if result == TierlistError.SUCCESS:
@@ -334,10 +459,18 @@ async def show(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True, ephemeral=True)
 
     active_list = manager.tierlists[manager.currently_active]
-    image_buffer = await renderer.render(active_list)
+    image_data = await renderer.render(active_list, bot.pool)
     
-    file = discord.File(image_buffer, filename="tierlist.png")
+    file = discord.File(BytesIO(image_data), filename="tierlist.png")
     await interaction.followup.send(file=file, ephemeral=True)
 
-if token:
+# pool workers may re-import this module, so only connect when run directly
+if __name__ == "__main__" and token:
+    # uvloop is optional; fall back to the stock asyncio loop without it
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
     bot.run(token)